@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+OG-RaidHelper Script Startup Benchmark
+Measures cold-start time of parse_consume_log.py and extract_segments.py
+
+Each case runs in a fresh interpreter, like a launch from the .bat wrappers.
+A bare interpreter start is measured too, so the script's own overhead
+(imports, argument parsing) can be read off as the difference. The .bat
+wrappers use "python -m", which loads the cached bytecode instead of
+recompiling the script on every launch.
+
+By default the runs use a generated log with consume pulls and segments, so the
+scripted case parses pulls and runs the exporters (TestCombatLog.txt only holds
+segments, which would make parse_consume_log.py exit before exporting).
+
+Usage: python benchmark_startup.py [--runs N] [--log path_to_WoWCombatLog.txt] [--importtime]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def write_sample_log(path: Path, pulls: int = 40, players: int = 25):
+    """Write a combat log with OGRH_CONSUME pulls and OGRH_SEGMENT records"""
+    classes = ('WARRIOR', 'PRIEST', 'MAGE', 'ROGUE', 'DRUID')
+    roles = ('TANKS', 'HEALERS', 'MELEE', 'RANGED')
+    start = 1767808800  # 01/07 19:00
+
+    with path.open('w', encoding='utf-8') as f:
+        for pull in range(pulls):
+            minutes = pull * 5
+            timestamp = start + minutes * 60
+            clock = f"{19 + minutes // 60:02d}:{minutes % 60:02d}"
+            encounter = f"Boss{pull % 8}"
+            stamp = f"1/7 {clock}:00.000"
+            f.write(f"{stamp}  OGRH_CONSUME_PULL: {timestamp}&01/07&{clock}&Naxxramas&{encounter}"
+                    f"&{pull + 1}&Leader&{players}\n")
+            for i in range(players):
+                score = 40 + (pull * 7 + i * 13) % 61
+                f.write(f"{stamp}  OGRH_CONSUME_PLAYER: Player{i}&{classes[i % 5]}&{roles[i % 4]}"
+                        f"&{score}&{score * 2}&200\n")
+            f.write(f"{stamp}  OGRH_CONSUME_END: {timestamp}\n")
+            
+            segment_id = f"seg_{timestamp}_{encounter.lower()}"
+            f.write(f"{stamp}  OGRH_SEGMENT_HEADER: {segment_id}&{encounter}&{timestamp}&2026-01-07 {clock}"
+                    f"&Naxxramas&1&{encounter}&{pull % 8 + 1}&120.00&{players}\n")
+            for i in range(players):
+                f.write(f"{stamp}  OGRH_SEGMENT_PLAYER: Player{i}&{classes[i % 5]}&{roles[i % 4]}"
+                        f"&{(i + 1) * 1000}&0&0\n")
+            f.write(f"{stamp}  OGRH_SEGMENT_END: {segment_id}\n")
+
+
+def time_command(command, runs: int) -> list:
+    """Wall time (ms) of each of `runs` runs of a command"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=SCRIPT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def print_import_times(module: str, top_n: int = 15):
+    """Print the slowest imports of a module (python -X importtime)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=SCRIPT_DIR, capture_output=True, text=True, check=False)
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].rstrip()))
+
+    print(f"\nSlowest imports for {module} (cumulative ms):")
+    for cumulative, name in sorted(rows, reverse=True)[:top_n]:
+        print(f"  {cumulative / 1000:8.2f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start time of the OG-RaidHelper scripts')
+    parser.add_argument('--runs', type=int, default=10, help='Runs per case (default: 10)')
+    parser.add_argument('--log', type=Path,
+                        help='Combat log used for the scripted runs (default: a generated sample log)')
+    parser.add_argument('--importtime', action='store_true', help='Also list the slowest imports')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        if args.log:
+            log = args.log.resolve()
+        else:
+            log = work_dir / 'WoWCombatLog.txt'
+            write_sample_log(log)
+        run_benchmark(str(log), work_dir / 'output', args.runs)
+
+    if args.importtime:
+        print_import_times('parse_consume_log')
+
+    return 0
+
+
+def run_benchmark(log: str, output_dir: Path, runs: int):
+    """Time each startup case against the given log"""
+    scripted = [log, '--mode', 'summary', '--quiet', '-o', str(output_dir)]
+    cases = [
+        ('python (bare interpreter)', [sys.executable, '-c', 'pass']),
+        ('import parse_consume_log', [sys.executable, '-c', 'import parse_consume_log']),
+        ('parse_consume_log.py (scripted)', [sys.executable, 'parse_consume_log.py'] + scripted),
+        ('-m parse_consume_log (scripted, .bat)', [sys.executable, '-m', 'parse_consume_log'] + scripted),
+        ('extract_segments.py', [sys.executable, 'extract_segments.py', log]),
+        ('-m extract_segments (.bat)', [sys.executable, '-m', 'extract_segments', log]),
+    ]
+
+    print(f"Startup benchmark ({runs} runs each, {sys.executable})")
+    print(f"{'='*80}")
+    print(f"{'Case':<38} {'Min ms':>9} {'Median ms':>10} {'Overhead ms':>12}")
+    print(f"{'-'*80}")
+
+    baseline = None
+    for name, command in cases:
+        time_command(command, 1)  # warm the OS file cache and .pyc files
+        timings = time_command(command, runs)
+        median = statistics.median(timings)
+        if baseline is None:
+            baseline = median
+        print(f"{name:<38} {min(timings):>9.1f} {median:>10.1f} {median - baseline:>12.1f}")
+
+    if not any(output_dir.glob('consume_player_stats_*.csv')):
+        print(f"⚠ The scripted runs exported nothing; {log} has no OGRH_CONSUME pulls")
+
+
+if __name__ == '__main__':
+    exit(main())
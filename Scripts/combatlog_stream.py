@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+OG-RaidHelper Combat Log Streaming Helpers
+Shared by parse_consume_log.py and extract_segments.py
+
+The read-ahead thread machinery (threading, queue) is imported by the block
+reader itself, so importing this module for its helpers stays cheap.
+"""
+
+import codecs
+import heapq
+import io
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Hashable, Iterable, Iterator, List
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_QUEUE_DEPTH = 4
+# Officers' clients stamp records with their own clock; copies of one record
+# up to this many seconds apart are treated as duplicates
+DUPLICATE_TOLERANCE_SECONDS = 60
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz')
+
+
+def _has_more_players(candidate: Dict[str, Any], kept: Dict[str, Any]) -> bool:
+    """Default duplicate resolution: keep the copy that captured the most players"""
+    return len(candidate.get('players', [])) > len(kept.get('players', []))
+
+
+def merge_chronological(sources: Iterable[Iterable[Dict[str, Any]]],
+                        time_key: Callable[[Dict[str, Any]], Any],
+                        identity_key: Callable[[Dict[str, Any]], Hashable],
+                        prefer: Callable[[Dict[str, Any], Dict[str, Any]], bool] = _has_more_players,
+                        tolerance: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Merge several time-ordered record streams into one chronological stream
+
+    Each source must already be sorted by time_key (records from a single
+    WoWCombatLog.txt are). Only the head record of each source and the records
+    of the last `tolerance` seconds are held in memory.
+
+    Records from different sources with the same identity_key and times at most
+    `tolerance` apart are duplicates (the same pull logged by several officers,
+    each stamped by their own client clock) and are collapsed into one copy.
+    prefer(candidate, kept) returns True when candidate should replace kept.
+    """
+    # Open duplicate groups: [first time, identity, source indexes, kept record]
+    pending: List[list] = []
+
+    def flush(limit=None) -> Iterator[Dict[str, Any]]:
+        # Emit, oldest first, the groups that no record at or after limit can join
+        while pending:
+            group = min(pending, key=lambda g: time_key(g[3]))
+            if limit is not None and group[0] >= limit:
+                return
+            pending.remove(group)
+            yield group[3]
+
+    def tag(index: int, source: Iterable[Dict[str, Any]]) -> Iterator[tuple]:
+        for record in source:
+            yield index, record
+
+    tagged = [tag(index, source) for index, source in enumerate(sources)]
+    for index, record in heapq.merge(*tagged, key=lambda item: time_key(item[1])):
+        record_time = time_key(record)
+        yield from flush(record_time - tolerance)
+
+        identity = identity_key(record)
+        for group in pending:
+            if group[1] == identity and index not in group[2]:
+                group[2].add(index)
+                if prefer(record, group[3]):
+                    group[3] = record
+                break
+        else:
+            pending.append([record_time, identity, {index}, record])
+
+    yield from flush()
+
+
+def _int_at_least(value: str, minimum: int) -> int:
+    import argparse
+
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < minimum:
+        raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {number}")
+    return number
+
+
+def positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1 (block size, queue depth, ...)"""
+    return _int_at_least(value, 1)
+
+
+def non_negative_int(value: str) -> int:
+    """argparse type for counts where 0 means all (--players)"""
+    return _int_at_least(value, 0)
+
+
+def is_compressed(filepath: Path) -> bool:
+    """True for logs archived as .gz, .bz2 or .xz"""
+    return filepath.suffix.lower() in COMPRESSED_SUFFIXES
+
+
+def _open_log_binary(filepath: Path) -> BinaryIO:
+    """Open a log for binary reading, decompressing archived logs on the fly"""
+    suffix = filepath.suffix.lower()
+    if suffix == '.gz':
+        import gzip
+        return gzip.open(filepath, 'rb')
+    if suffix == '.bz2':
+        import bz2
+        return bz2.open(filepath, 'rb')
+    if suffix == '.xz':
+        import lzma
+        return lzma.open(filepath, 'rb')
+    return filepath.open('rb')
+
+
+def iter_blocks_read_ahead(filepath: Path, block_size: int = DEFAULT_BLOCK_SIZE,
+                           queue_depth: int = DEFAULT_QUEUE_DEPTH) -> Iterator[bytes]:
+    """
+    Read a log in large blocks on a background thread
+
+    The reader thread (which also does any decompression) stays up to
+    queue_depth (at least 1) blocks ahead of the consumer, so parsing one block overlaps
+    with reading the next. Errors in the reader are re-raised here.
+    """
+    import queue
+    import threading
+
+    # maxsize < 1 would make the queue unbounded
+    blocks = queue.Queue(maxsize=max(queue_depth, 1))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        try:
+            with _open_log_binary(filepath) as f:
+                while True:
+                    block = f.read(block_size)
+                    if not put(block) or not block:
+                        return
+        except BaseException as exc:
+            put(exc)
+
+    thread = threading.Thread(target=reader, name=f"read-ahead {filepath.name}", daemon=True)
+    thread.start()
+    try:
+        while True:
+            block = blocks.get()
+            if isinstance(block, BaseException):
+                raise block
+            if not block:
+                return
+            yield block
+    finally:
+        # Also reached when the consumer stops early; release the reader thread
+        stop.set()
+        thread.join()
+
+
+def iter_lines_read_ahead(filepath: Path, block_size: int = DEFAULT_BLOCK_SIZE,
+                          queue_depth: int = DEFAULT_QUEUE_DEPTH,
+                          encoding: str = 'utf-8', errors: str = 'ignore') -> Iterator[str]:
+    """
+    Iterate the lines of a log using the read-ahead block reader
+
+    Yields exactly what iterating filepath.open('r', encoding=..., errors=...)
+    would: universal newlines translated to '\\n' and kept on each line.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors=errors),
+                                           translate=True)
+    pending = ''
+    for block in iter_blocks_read_ahead(filepath, block_size, queue_depth):
+        lines = (pending + decoder.decode(block)).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+
+    lines = (pending + decoder.decode(b'', final=True)).split('\n')
+    pending = lines.pop()
+    for line in lines:
+        yield line + '\n'
+    if pending:
+        yield pending
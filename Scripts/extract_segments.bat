@@ -1,4 +1,5 @@
 @echo off
+setlocal
 REM OG-RaidHelper Segment Recovery - Combat Log Extractor
 REM Quick launcher for Windows
 
@@ -21,11 +22,14 @@ if errorlevel 1 (
 echo Python found. Running segment extractor...
 echo.
 
+REM "python -m" reuses the cached bytecode, so startup is faster than running the .py
+set "PYTHONPATH=%~dp0;%PYTHONPATH%"
+
 REM Check if a file was dragged onto the batch file
 if not "%~1"=="" (
     if exist "%~1" (
         echo Using provided file: %~1
-        python "%~dp0extract_segments.py" "%~1"
+        python -m extract_segments "%~1"
         goto :end
     ) else (
         echo ERROR: File not found: %~1
@@ -36,17 +40,17 @@ if not "%~1"=="" (
 REM Check if WoWCombatLog.txt exists in the batch file's directory
 if exist "%~dp0WoWCombatLog.txt" (
     echo Found WoWCombatLog.txt in script directory
-    python "%~dp0extract_segments.py" "%~dp0WoWCombatLog.txt"
+    python -m extract_segments "%~dp0WoWCombatLog.txt"
 ) else if exist "WoWCombatLog.txt" (
     REM Check current working directory as fallback
     echo Found WoWCombatLog.txt in current directory
-    python "%~dp0extract_segments.py" "WoWCombatLog.txt"
+    python -m extract_segments "WoWCombatLog.txt"
 ) else (
     REM Try default Turtle WoW location
     set "DEFAULT_LOG=D:\games\TurtleWow\Logs\WoWCombatLog.txt"
     if exist "%DEFAULT_LOG%" (
         echo Found WoWCombatLog.txt at: %DEFAULT_LOG%
-        python "%~dp0extract_segments.py" "%DEFAULT_LOG%"
+        python -m extract_segments "%DEFAULT_LOG%"
     ) else (
         echo.
         echo ERROR: Could not find WoWCombatLog.txt
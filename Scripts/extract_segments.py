@@ -4,88 +4,158 @@ OG-RaidHelper Segment Recovery - WoWCombatLog Parser
 Extracts OGRH segment data from WoWCombatLog.txt for crash recovery
 Written by OGRH.PendingSegments.WriteSegmentToCombatLog()
 
-Usage: python extract_segments.py [path_to_WoWCombatLog.txt]
+Usage: python extract_segments.py [path_to_WoWCombatLog.txt ...] [--block-size KiB] [--queue-depth N]
 """
 
 import re
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 
+from combatlog_stream import (
+    merge_chronological, iter_lines_read_ahead, positive_int, DEFAULT_BLOCK_SIZE, DEFAULT_QUEUE_DEPTH,
+    DUPLICATE_TOLERANCE_SECONDS
+)
 
-def parse_segments_from_combatlog(filepath: Path) -> List[Dict[str, Any]]:
+
+def parse_segments_from_combatlog(filepath: Path, block_size: int = DEFAULT_BLOCK_SIZE,
+                                  queue_depth: int = DEFAULT_QUEUE_DEPTH) -> List[Dict[str, Any]]:
+    """Parse WoWCombatLog.txt for OGRH_SEGMENT entries (see iter_segments_from_combatlog)"""
+    return list(iter_segments_from_combatlog(filepath, block_size, queue_depth))
+
+
+def iter_segments_from_combatlog(filepath: Path, block_size: int = DEFAULT_BLOCK_SIZE,
+                                 queue_depth: int = DEFAULT_QUEUE_DEPTH) -> Iterator[Dict[str, Any]]:
+    """
+    Stream OGRH_SEGMENT entries from WoWCombatLog.txt in log order
+    
+    The log is read ahead on a background thread (see combatlog_stream) while
+    segments are parsed; .gz/.bz2/.xz logs are decompressed on that thread.
     """
-    Parse WoWCombatLog.txt for OGRH_SEGMENT entries
+    yield from iter_segment_entries(iter_lines_read_ahead(filepath, block_size, queue_depth))
+
+
+def parse_segment_header(line: str) -> Optional[Dict[str, Any]]:
+    """Parse an OGRH_SEGMENT_HEADER line, or return None if it is not one"""
+    match = re.search(r'OGRH_SEGMENT_HEADER:\s+(.+)', line)
+    if not match:
+        return None
+    
+    data = match.group(1).split('&')
+    if len(data) < 10:
+        return None
+    
+    return {
+        'segmentId': data[0],
+        'name': data[1],
+        'timestamp': data[2],
+        'createdAt': data[3],
+        'raidName': data[4],
+        'raidIndex': int(data[5]) if data[5].isdigit() else 0,
+        'encounterName': data[6],
+        'encounterIndex': int(data[7]) if data[7].isdigit() else 0,
+        'combatTime': float(data[8]) if data[8].replace('.', '', 1).isdigit() else 0.0,
+        'playerCount': int(data[9]) if data[9].isdigit() else 0,
+        'players': []
+    }
+
+
+def parse_segment_player(line: str) -> Optional[Dict[str, Any]]:
+    """Parse an OGRH_SEGMENT_PLAYER line, or return None if it is not one"""
+    match = re.search(r'OGRH_SEGMENT_PLAYER:\s+(.+)', line)
+    if not match:
+        return None
+    
+    data = match.group(1).split('&')
+    if len(data) < 6:
+        return None
+    
+    return {
+        'name': data[0],
+        'class': data[1],
+        'role': data[2],
+        'damage': int(data[3]) if data[3].isdigit() else 0,
+        'effectiveHealing': int(data[4]) if data[4].isdigit() else 0,
+        'totalHealing': int(data[5]) if data[5].isdigit() else 0
+    }
+
+
+def parse_segment_end(line: str) -> Optional[str]:
+    """Return the segment ID of an OGRH_SEGMENT_END line, or None if it is not one"""
+    match = re.search(r'OGRH_SEGMENT_END:\s+(.+)', line)
+    return match.group(1) if match else None
+
+
+def iter_segment_entries(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse OGRH_SEGMENT entries from combat log lines
     
     Format:
     OGRH_SEGMENT_HEADER: segmentId&name&timestamp&createdAt&raidName&raidIndex&encounterName&encounterIndex&combatTime&playerCount
     OGRH_SEGMENT_PLAYER: playerName&class&role&damage&effectiveHealing&totalHealing
     OGRH_SEGMENT_END: segmentId
     """
-    segments = []
     current_segment = None
     
-    with filepath.open('r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            line = line.strip()
-            
-            # OGRH_SEGMENT_HEADER: header line
-            if 'OGRH_SEGMENT_HEADER:' in line:
-                match = re.search(r'OGRH_SEGMENT_HEADER:\s+(.+)', line)
-                if match:
-                    data = match.group(1).split('&')
-                    
-                    if len(data) >= 10:
-                        # Save previous segment if exists
-                        if current_segment:
-                            segments.append(current_segment)
-                        
-                        current_segment = {
-                            'segmentId': data[0],
-                            'name': data[1],
-                            'timestamp': data[2],
-                            'createdAt': data[3],
-                            'raidName': data[4],
-                            'raidIndex': int(data[5]) if data[5].isdigit() else 0,
-                            'encounterName': data[6],
-                            'encounterIndex': int(data[7]) if data[7].isdigit() else 0,
-                            'combatTime': float(data[8]) if data[8].replace('.', '', 1).isdigit() else 0.0,
-                            'playerCount': int(data[9]) if data[9].isdigit() else 0,
-                            'players': []
-                        }
-            
-            # OGRH_SEGMENT_PLAYER: player data line
-            elif 'OGRH_SEGMENT_PLAYER:' in line and current_segment:
-                match = re.search(r'OGRH_SEGMENT_PLAYER:\s+(.+)', line)
-                if match:
-                    data = match.group(1).split('&')
-                    
-                    if len(data) >= 6:
-                        player_entry = {
-                            'name': data[0],
-                            'class': data[1],
-                            'role': data[2],
-                            'damage': int(data[3]) if data[3].isdigit() else 0,
-                            'effectiveHealing': int(data[4]) if data[4].isdigit() else 0,
-                            'totalHealing': int(data[5]) if data[5].isdigit() else 0
-                        }
-                        current_segment['players'].append(player_entry)
-            
-            # OGRH_SEGMENT_END: end marker
-            elif 'OGRH_SEGMENT_END:' in line and current_segment:
-                match = re.search(r'OGRH_SEGMENT_END:\s+(.+)', line)
-                if match:
-                    segment_id = match.group(1)
-                    # Verify segment ID matches
-                    if segment_id == current_segment['segmentId']:
-                        segments.append(current_segment)
-                        current_segment = None
+    for line in lines:
+        line = line.strip()
+        
+        # OGRH_SEGMENT_HEADER: header line
+        if 'OGRH_SEGMENT_HEADER:' in line:
+            header = parse_segment_header(line)
+            if header:
+                # Save previous segment if exists
+                if current_segment:
+                    yield current_segment
+                current_segment = header
+        
+        # OGRH_SEGMENT_PLAYER: player data line
+        elif 'OGRH_SEGMENT_PLAYER:' in line and current_segment:
+            player_entry = parse_segment_player(line)
+            if player_entry:
+                current_segment['players'].append(player_entry)
+        
+        # OGRH_SEGMENT_END: end marker
+        elif 'OGRH_SEGMENT_END:' in line and current_segment:
+            # Verify segment ID matches
+            if parse_segment_end(line) == current_segment['segmentId']:
+                yield current_segment
+                current_segment = None
     
     # Add last segment if not closed
     if current_segment:
-        segments.append(current_segment)
+        yield current_segment
+
+
+def segment_time(segment: Dict[str, Any]) -> int:
+    """Segment capture time (epoch seconds) used to order segments across logs"""
+    return int(segment['timestamp']) if segment['timestamp'].isdigit() else 0
+
+
+def segment_identity(segment: Dict[str, Any]) -> tuple:
+    """
+    Key identifying the same segment when it appears in several officers' logs
+    
+    segmentId embeds the capturing client's time(), so it differs between
+    officers; copies are matched on this key within DUPLICATE_TOLERANCE_SECONDS.
+    """
+    return (segment['name'], segment['raidName'], segment['encounterName'])
+
+
+def merge_segment_files(filepaths: List[Path], block_size: int = DEFAULT_BLOCK_SIZE,
+                        queue_depth: int = DEFAULT_QUEUE_DEPTH) -> Iterator[Dict[str, Any]]:
+    """
+    Merge OGRH_SEGMENT entries from several logs into one chronological stream
     
-    return segments
+    A segment written to more than one officer's log is kept once (the copy
+    with the most players), even when their clocks differ by a few seconds.
+    """
+    return merge_chronological(
+        (iter_segments_from_combatlog(path, block_size, queue_depth) for path in filepaths),
+        time_key=segment_time,
+        identity_key=segment_identity,
+        tolerance=DUPLICATE_TOLERANCE_SECONDS
+    )
 
 
 def output_importable_format(segments: List[Dict[str, Any]]) -> None:
@@ -137,24 +207,53 @@ def output_importable_format(segments: List[Dict[str, Any]]) -> None:
 
 
 def main():
-    # Parse command line arguments
-    if len(sys.argv) > 1:
-        combatlog_path = Path(sys.argv[1])
-    else:
-        combatlog_path = Path("WoWCombatLog.txt")
+    import argparse
     
-    # Check if file exists
-    if not combatlog_path.exists():
-        print(f"ERROR: Could not find combat log file: {combatlog_path}")
-        print()
-        print("Usage: python extract_segments.py [path_to_WoWCombatLog.txt]")
-        print('Example: python extract_segments.py "C:\\Games\\TurtleWow\\Logs\\WoWCombatLog.txt"')
-        sys.exit(1)
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description='Extract OGRH segment data from WoWCombatLog.txt for crash recovery'
+    )
+    parser.add_argument(
+        'logfiles',
+        nargs='*',
+        type=Path,
+        default=[Path("WoWCombatLog.txt")],
+        metavar='logfile',
+        help='Path to WoWCombatLog.txt (default: WoWCombatLog.txt in current folder). '
+             'Several logs are merged into one chronological timeline'
+    )
+    parser.add_argument(
+        '--block-size',
+        type=positive_int,
+        default=DEFAULT_BLOCK_SIZE // 1024,
+        help=f'Read-ahead block size in KiB (default: {DEFAULT_BLOCK_SIZE // 1024})'
+    )
+    parser.add_argument(
+        '--queue-depth',
+        type=positive_int,
+        default=DEFAULT_QUEUE_DEPTH,
+        help=f'Number of blocks read ahead of the parser (default: {DEFAULT_QUEUE_DEPTH})'
+    )
+    args = parser.parse_args()
+    combatlog_paths = args.logfiles
+    block_size = args.block_size * 1024
     
-    print(f"Parsing combat log: {combatlog_path}")
+    # Check if files exist
+    for combatlog_path in combatlog_paths:
+        if not combatlog_path.exists():
+            print(f"ERROR: Could not find combat log file: {combatlog_path}")
+            print()
+            print("Usage: python extract_segments.py [path_to_WoWCombatLog.txt ...]")
+            print('Example: python extract_segments.py "C:\\Games\\TurtleWow\\Logs\\WoWCombatLog.txt"')
+            sys.exit(1)
     
-    # Parse segments
-    segments = parse_segments_from_combatlog(combatlog_path)
+    # Parse segments (several logs are merged into one chronological timeline)
+    if len(combatlog_paths) == 1:
+        print(f"Parsing combat log: {combatlog_paths[0]}")
+        segments = parse_segments_from_combatlog(combatlog_paths[0], block_size, args.queue_depth)
+    else:
+        print(f"Merging {len(combatlog_paths)} combat logs: {', '.join(str(p) for p in combatlog_paths)}")
+        segments = list(merge_segment_files(combatlog_paths, block_size, args.queue_depth))
     
     # Output in importable format
     output_importable_format(segments)
@@ -1,4 +1,5 @@
 @echo off
+setlocal
 REM OG-RaidHelper Consume Log Parser
 REM Quick launcher for Windows
 
@@ -23,7 +24,11 @@ echo.
 
 REM Run the parser in interactive mode (default)
 REM User will be prompted to select output mode, encounter, and player count
-python "%~dp0parse_consume_log.py"
+REM Any arguments are passed through, e.g. a scripted run that skips the prompts:
+REM   parse_consume_log.bat --profile nightly.json
+REM "python -m" reuses the cached bytecode, so startup is faster than running the .py
+set "PYTHONPATH=%~dp0;%PYTHONPATH%"
+python -m parse_consume_log %*
 
 echo.
 echo ========================================
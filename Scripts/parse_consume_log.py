@@ -6,18 +6,107 @@ Written by SuperWoW's CombatLogAdd() function
 """
 
 import re
-import json
-import csv
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any
-import argparse
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from collections import defaultdict
+from itertools import chain, groupby
+from datetime import datetime, timedelta
 
+# json, csv, hashlib, argparse and the segment parsers (extract_segments, only
+# needed by the player index) are imported where they are used; combatlog_stream
+# likewise imports its read-ahead thread machinery only when a log is read
 
-def parse_combatlog_file(filepath: Path) -> List[Dict[str, Any]]:
+from combatlog_stream import (
+    merge_chronological, iter_lines_read_ahead, is_compressed, positive_int, non_negative_int,
+    DEFAULT_BLOCK_SIZE, DEFAULT_QUEUE_DEPTH, DUPLICATE_TOLERANCE_SECONDS
+)
+
+PLAYER_INDEX_VERSION = 1
+PLAYER_INDEX_SIGNATURE_BYTES = 4096
+
+ROLLUP_VERSION = 2
+ROLLUP_PERIODS = ('night', 'week', 'season')
+# Pulls before this hour count towards the previous raid night
+RAID_NIGHT_ROLLOVER_HOURS = 6
+
+TREND_VERSION = 2
+TREND_MODES = ('pulls', 'weeks')
+DEFAULT_TREND_WINDOW = {'pulls': 10, 'weeks': 4}
+DEFAULT_TREND_DROP = 10.0
+
+DEFAULT_TOP_PLAYERS = 20
+
+# Report answers that can be given as flags or stored in a --profile file
+PROFILE_KEYS = ('mode', 'raid', 'date', 'encounter', 'players', 'output')
+PROFILE_LIST_KEYS = ('raid', 'date', 'encounter')
+
+
+def parse_combatlog_file(filepath: Path, block_size: int = DEFAULT_BLOCK_SIZE,
+                         queue_depth: int = DEFAULT_QUEUE_DEPTH) -> List[Dict[str, Any]]:
+    """Parse WoWCombatLog.txt for OGRH_CONSUME entries (see iter_combatlog_file)"""
+    return list(iter_combatlog_file(filepath, block_size, queue_depth))
+
+
+def iter_combatlog_file(filepath: Path, block_size: int = DEFAULT_BLOCK_SIZE,
+                        queue_depth: int = DEFAULT_QUEUE_DEPTH) -> Iterator[Dict[str, Any]]:
+    """
+    Stream OGRH_CONSUME entries from WoWCombatLog.txt in log order
+    
+    The log is read ahead on a background thread in block_size blocks (up to
+    queue_depth blocks buffered) while entries are parsed. .gz/.bz2/.xz logs
+    are decompressed by the reader thread.
+    """
+    yield from iter_consume_entries(iter_lines_read_ahead(filepath, block_size, queue_depth))
+
+
+def parse_pull_header(line: str) -> Optional[Dict[str, Any]]:
+    """Parse an OGRH_CONSUME_PULL header line, or return None if it is not one"""
+    match = re.search(r'(\d+/\d+ \d+:\d+:\d+\.\d+)\s+OGRH_CONSUME_PULL:\s+(.+)', line)
+    if not match:
+        return None
+    
+    log_timestamp = match.group(1)
+    data = match.group(2).split('&')
+    if len(data) < 8:
+        return None
+    
+    return {
+        'logTimestamp': log_timestamp,
+        'timestamp': int(data[0]) if data[0].isdigit() else 0,
+        'date': data[1],
+        'time': data[2],
+        'raid': data[3],
+        'encounter': data[4],
+        'pullNumber': int(data[5]) if data[5].isdigit() else 0,
+        'requester': data[6],
+        'groupSize': int(data[7]) if data[7].isdigit() else 0,
+        'players': []
+    }
+
+
+def parse_pull_player(line: str) -> Optional[Dict[str, Any]]:
+    """Parse an OGRH_CONSUME_PLAYER line, or return None if it is not one"""
+    match = re.search(r'OGRH_CONSUME_PLAYER:\s+(.+)', line)
+    if not match:
+        return None
+    
+    data = match.group(1).split('&')
+    if len(data) < 6:
+        return None
+    
+    return {
+        'name': data[0],
+        'class': data[1],
+        'role': data[2],
+        'score': int(data[3]) if data[3].isdigit() else 0,
+        'actualPoints': int(data[4]) if data[4].isdigit() else 0,
+        'possiblePoints': int(data[5]) if data[5].isdigit() else 0
+    }
+
+
+def iter_consume_entries(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
     """
-    Parse WoWCombatLog.txt for OGRH_CONSUME entries
+    Parse OGRH_CONSUME entries from combat log lines
     
     Format:
     MM/DD HH:MM:SS.mmm  OGRH_CONSUME_PULL: timestamp&date&time&raid&encounter&pullNumber&requester&groupSize
@@ -26,68 +115,300 @@ def parse_combatlog_file(filepath: Path) -> List[Dict[str, Any]]:
     MM/DD HH:MM:SS.mmm  OGRH_CONSUME_END: timestamp
     """
     
-    logs = []
     current_entry = None
     
-    with filepath.open('r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            line = line.strip()
-            
-            # OGRH_CONSUME_PULL: header line
-            if 'OGRH_CONSUME_PULL:' in line:
-                match = re.search(r'(\d+/\d+ \d+:\d+:\d+\.\d+)\s+OGRH_CONSUME_PULL:\s+(.+)', line)
-                if match:
-                    log_timestamp = match.group(1)
-                    data = match.group(2).split('&')
-                    
-                    if len(data) >= 8:
-                        # Save previous entry if exists
-                        if current_entry:
-                            logs.append(current_entry)
-                        
-                        current_entry = {
-                            'logTimestamp': log_timestamp,
-                            'timestamp': int(data[0]) if data[0].isdigit() else 0,
-                            'date': data[1],
-                            'time': data[2],
-                            'raid': data[3],
-                            'encounter': data[4],
-                            'pullNumber': int(data[5]) if data[5].isdigit() else 0,
-                            'requester': data[6],
-                            'groupSize': int(data[7]) if data[7].isdigit() else 0,
-                            'players': []
-                        }
-            
-            # OGRH_CONSUME_PLAYER: player data line
-            elif 'OGRH_CONSUME_PLAYER:' in line and current_entry:
-                match = re.search(r'OGRH_CONSUME_PLAYER:\s+(.+)', line)
-                if match:
-                    data = match.group(1).split('&')
-                    
-                    if len(data) >= 6:
-                        player_entry = {
-                            'name': data[0],
-                            'class': data[1],
-                            'role': data[2],
-                            'score': int(data[3]) if data[3].isdigit() else 0,
-                            'actualPoints': int(data[4]) if data[4].isdigit() else 0,
-                            'possiblePoints': int(data[5]) if data[5].isdigit() else 0
-                        }
-                        current_entry['players'].append(player_entry)
-            
-            # OGRH_CONSUME_END: end marker
-            elif 'OGRH_CONSUME_END:' in line and current_entry:
-                logs.append(current_entry)
-                current_entry = None
+    for line in lines:
+        line = line.strip()
+        
+        # OGRH_CONSUME_PULL: header line
+        if 'OGRH_CONSUME_PULL:' in line:
+            header = parse_pull_header(line)
+            if header:
+                # Save previous entry if exists
+                if current_entry:
+                    yield current_entry
+                current_entry = header
+        
+        # OGRH_CONSUME_PLAYER: player data line
+        elif 'OGRH_CONSUME_PLAYER:' in line and current_entry:
+            player_entry = parse_pull_player(line)
+            if player_entry:
+                current_entry['players'].append(player_entry)
+        
+        # OGRH_CONSUME_END: end marker
+        elif 'OGRH_CONSUME_END:' in line and current_entry:
+            yield current_entry
+            current_entry = None
     
     # Add last entry if not closed
     if current_entry:
-        logs.append(current_entry)
+        yield current_entry
+
+
+def pull_identity(entry: Dict[str, Any]) -> tuple:
+    """
+    Key identifying the same pull when it appears in several officers' logs
+    
+    Each officer's client stamps the pull with its own time(), so copies are
+    matched on this key within DUPLICATE_TOLERANCE_SECONDS rather than on the
+    timestamp itself.
+    """
+    return (entry['raid'], entry['encounter'], entry['pullNumber'], entry['requester'])
+
+
+def pull_id(entry: Dict[str, Any]) -> list:
+    """Stored form of a pull (timestamp followed by its identity), as kept in rollups and trends"""
+    return [entry['timestamp'], *pull_identity(entry)]
+
+
+def _pull_times(pull_ids: Iterable[list]) -> Dict[tuple, List[int]]:
+    """Timestamps of stored pulls grouped by identity"""
+    times = defaultdict(list)
+    for stored in pull_ids:
+        times[tuple(stored[1:])].append(stored[0])
+    return times
+
+
+def _has_pull(times: Dict[tuple, List[int]], identity: tuple, timestamp: int) -> bool:
+    """True if a stored pull with this identity lies within the duplicate tolerance"""
+    return any(abs(stored - timestamp) <= DUPLICATE_TOLERANCE_SECONDS for stored in times.get(identity, ()))
+
+
+def merge_combatlog_files(filepaths: List[Path], block_size: int = DEFAULT_BLOCK_SIZE,
+                          queue_depth: int = DEFAULT_QUEUE_DEPTH) -> Iterator[Dict[str, Any]]:
+    """
+    Merge OGRH_CONSUME entries from several logs into one chronological stream
+    
+    Logs are read lazily and merged on the pull timestamp. A pull captured by
+    more than one officer is kept once (the copy with the most players), even
+    when their clocks differ by a few seconds.
+    """
+    return merge_chronological(
+        (iter_combatlog_file(path, block_size, queue_depth) for path in filepaths),
+        time_key=lambda entry: entry['timestamp'],
+        identity_key=pull_identity,
+        tolerance=DUPLICATE_TOLERANCE_SECONDS
+    )
+
+
+def default_index_path(logfile: Path) -> Path:
+    """Player index file kept next to the combat log"""
+    return logfile.with_name(logfile.name + '.ogrh_index.json')
+
+
+def _log_signature(filepath: Path, length: int) -> str:
+    """Hash of the start of the log, used to detect a cleared or replaced log"""
+    import hashlib
     
-    return logs
+    with filepath.open('rb') as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def _new_player_index(logfile: Path) -> Dict[str, Any]:
+    return {
+        'version': PLAYER_INDEX_VERSION,
+        'logfile': str(logfile),
+        'signature': '',
+        'signatureBytes': 0,
+        'offset': 0,
+        'players': {}
+    }
 
 
-def aggregate_by_player(logs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+def _index_add(index: Dict[str, Any], name: str, kind: str, offset: int):
+    """Record that a player appears in the pull/segment record starting at offset"""
+    offsets = index['players'].setdefault(name, {'pulls': [], 'segments': []})[kind]
+    if not offsets or offsets[-1] != offset:
+        offsets.append(offset)
+
+
+def update_player_index(logfile: Path, index_path: Path = None) -> Dict[str, Any]:
+    """
+    Build or incrementally update the inverted player index for a combat log
+    
+    The index maps each player name to the byte offsets of the OGRH_CONSUME_PULL
+    and OGRH_SEGMENT_HEADER lines of the records they appear in. Only the part of
+    the log written since the last update is scanned; the last record, if it was
+    still open at the end of the previous scan, is rescanned. The index is rebuilt
+    from scratch if the log was cleared or replaced.
+    """
+    import json
+    from bisect import bisect_left
+    from extract_segments import parse_segment_header, parse_segment_player, parse_segment_end
+    
+    index_path = index_path or default_index_path(logfile)
+    size = logfile.stat().st_size
+    
+    index = None
+    if index_path.exists():
+        try:
+            with index_path.open('r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+    
+    if (not index or index.get('version') != PLAYER_INDEX_VERSION
+            or index['offset'] > size
+            or index['signature'] != _log_signature(logfile, index['signatureBytes'])):
+        index = _new_player_index(logfile)
+    
+    offset = index['offset']
+    if offset == size and index['signatureBytes'] > 0:
+        return index
+    
+    # Drop offsets at or past the resume point; those records are rescanned below
+    for entry in index['players'].values():
+        for kind in ('pulls', 'segments'):
+            offsets = entry[kind]
+            del offsets[bisect_left(offsets, offset):]
+    
+    open_pull = None
+    open_segment = None
+    with logfile.open('rb') as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                # Line is still being written; pick it up on the next update
+                break
+            line_offset = offset
+            offset += len(raw)
+            line = raw.decode('utf-8', errors='ignore').strip()
+            
+            # The addon writes each record's lines in one go, so a new header of
+            # either kind means every earlier record is complete (even one whose
+            # end marker is missing after a crash) and is no longer rescanned
+            if 'OGRH_CONSUME_PULL:' in line:
+                if parse_pull_header(line):
+                    open_pull = line_offset
+                    open_segment = None
+            elif 'OGRH_CONSUME_PLAYER:' in line and open_pull is not None:
+                player = parse_pull_player(line)
+                if player:
+                    _index_add(index, player['name'], 'pulls', open_pull)
+            elif 'OGRH_CONSUME_END:' in line:
+                open_pull = None
+            elif 'OGRH_SEGMENT_HEADER:' in line:
+                header = parse_segment_header(line)
+                if header:
+                    open_segment = (line_offset, header['segmentId'])
+                    open_pull = None
+            elif 'OGRH_SEGMENT_PLAYER:' in line and open_segment is not None:
+                player = parse_segment_player(line)
+                if player:
+                    _index_add(index, player['name'], 'segments', open_segment[0])
+            elif 'OGRH_SEGMENT_END:' in line and open_segment is not None:
+                if parse_segment_end(line) == open_segment[1]:
+                    open_segment = None
+    
+    # Resume from the earliest record that may still receive player lines
+    open_offsets = [o for o in (open_pull, open_segment and open_segment[0]) if o is not None]
+    index['offset'] = min(open_offsets) if open_offsets else offset
+    index['signatureBytes'] = min(size, PLAYER_INDEX_SIGNATURE_BYTES)
+    index['signature'] = _log_signature(logfile, index['signatureBytes'])
+    index['logfile'] = str(logfile)
+    
+    with index_path.open('w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    
+    return index
+
+
+def _find_indexed_player(index: Dict[str, Any], player_name: str) -> Optional[str]:
+    """Case-insensitive lookup of a player name in the index"""
+    if player_name in index['players']:
+        return player_name
+    wanted = player_name.casefold()
+    for name in index['players']:
+        if name.casefold() == wanted:
+            return name
+    return None
+
+
+def _read_records_at(logfile: Path, offsets: List[int], parse_lines) -> Iterator[Dict[str, Any]]:
+    """Decode only the records starting at the given byte offsets"""
+    with logfile.open('rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            lines = (raw.decode('utf-8', errors='ignore') for raw in iter(f.readline, b''))
+            record = next(parse_lines(lines), None)
+            if record:
+                yield record
+
+
+def query_player_history(logfiles: List[Path], player_name: str,
+                         index_path: Path = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Look up one player's pulls and segments through the player index
+    
+    Returns {'pulls': [...], 'segments': [...]} in chronological order. Each record
+    is decoded from the log at its indexed offset and its players list is trimmed
+    to the requested player, so the result feeds the usual aggregators/exporters.
+    """
+    from extract_segments import iter_segment_entries, segment_time, segment_identity
+    
+    pull_sources = []
+    segment_sources = []
+    for logfile in logfiles:
+        index = update_player_index(logfile, index_path if len(logfiles) == 1 else None)
+        name = _find_indexed_player(index, player_name)
+        if not name:
+            continue
+        
+        pulls = []
+        for entry in _read_records_at(logfile, index['players'][name]['pulls'], iter_consume_entries):
+            entry['players'] = [p for p in entry['players'] if p['name'] == name]
+            pulls.append(entry)
+        pull_sources.append(pulls)
+        
+        segments = []
+        for segment in _read_records_at(logfile, index['players'][name]['segments'], iter_segment_entries):
+            segment['players'] = [p for p in segment['players'] if p['name'] == name]
+            segments.append(segment)
+        segment_sources.append(segments)
+    
+    return {
+        'pulls': list(merge_chronological(pull_sources, lambda entry: entry['timestamp'], pull_identity,
+                                          tolerance=DUPLICATE_TOLERANCE_SECONDS)),
+        'segments': list(merge_chronological(segment_sources, segment_time, segment_identity,
+                                             tolerance=DUPLICATE_TOLERANCE_SECONDS))
+    }
+
+
+def print_player_history(player_name: str, history: Dict[str, List[Dict[str, Any]]]):
+    """Print one player's pull and segment history"""
+    pulls = history['pulls']
+    segments = history['segments']
+    
+    print(f"\n{'='*80}")
+    print(f"Player History: {player_name}")
+    print(f"{'='*80}")
+    
+    if not pulls and not segments:
+        print("No records found for this player.")
+        return
+    
+    if pulls:
+        stats = next(iter(aggregate_by_player(pulls).values()))
+        print(f"Pulls: {stats['pulls']} | Avg: {stats['avgScore']:.1f}% | "
+              f"Min: {stats['minScore']}% | Max: {stats['maxScore']}% | "
+              f"Points: {stats['totalActualPoints']}/{stats['totalPossiblePoints']}")
+        print(f"\n{'Date':<7} {'Time':<6} {'Raid - Encounter':<40} {'Pull':<6} {'Score':<6}")
+        print(f"{'-'*80}")
+        for entry in pulls:
+            player = entry['players'][0]
+            print(f"{entry['date']:<7} {entry['time']:<6} {entry['raid'] + ' - ' + entry['encounter']:<40} "
+                  f"{entry['pullNumber']:<6} {player['score']:<6}")
+    
+    if segments:
+        print(f"\n{'Segment':<40} {'Damage':<10} {'Eff. Healing':<13} {'Total Healing':<13}")
+        print(f"{'-'*80}")
+        for segment in segments:
+            player = segment['players'][0]
+            print(f"{segment['name']:<40} {player['damage']:<10} "
+                  f"{player['effectiveHealing']:<13} {player['totalHealing']:<13}")
+
+
+def aggregate_by_player(logs: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     """
     Aggregate all tracking records by player name
     Returns player statistics across all pulls
@@ -125,6 +446,8 @@ def aggregate_by_player(logs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]
         avg_score = stats['totalScore'] / stats['pulls'] if stats['pulls'] > 0 else 0
         min_score = min(stats['scores']) if stats['scores'] else 0
         max_score = max(stats['scores']) if stats['scores'] else 0
+        # Lower median, as read off the score histogram in rollups
+        median_score = sorted(stats['scores'])[(len(stats['scores']) - 1) // 2] if stats['scores'] else 0
         
         result[name] = {
             'name': name,
@@ -134,6 +457,7 @@ def aggregate_by_player(logs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]
             'avgScore': round(avg_score, 1),
             'minScore': min_score,
             'maxScore': max_score,
+            'medianScore': median_score,
             'totalActualPoints': stats['totalActualPoints'],
             'totalPossiblePoints': stats['totalPossiblePoints'],
             'raids': sorted(list(stats['raids'])),
@@ -143,7 +467,7 @@ def aggregate_by_player(logs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]
     return result
 
 
-def aggregate_by_encounter(logs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+def aggregate_by_encounter(logs: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     """
     Aggregate tracking records by raid encounter
     Returns encounter statistics
@@ -193,8 +517,582 @@ def aggregate_by_encounter(logs: List[Dict[str, Any]]) -> Dict[str, Dict[str, An
     return result
 
 
+def raid_night_key(entry: Dict[str, Any]) -> str:
+    """Raid night (YYYY-MM-DD, local time) a pull belongs to"""
+    if not entry['timestamp']:
+        return 'unknown'
+    night = datetime.fromtimestamp(entry['timestamp']) - timedelta(hours=RAID_NIGHT_ROLLOVER_HOURS)
+    return night.strftime('%Y-%m-%d')
+
+
+def rollup_period_key(night: str, period: str) -> str:
+    """Map a raid night to its night, ISO week (2026-W02) or season (2026-Q1) key"""
+    if period == 'night' or night == 'unknown':
+        return night
+    day = datetime.strptime(night, '%Y-%m-%d')
+    if period == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+
+
+def build_rollup(logs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build a mergeable rollup of tracking records
+    
+    Holds only counts, sums, min/max and a score histogram per player and
+    encounter, so rollups of different nights can be combined with merge_rollups
+    without going back to the raw pulls.
+    """
+    rollup = {'pulls': 0, 'players': {}, 'encounters': {}}
+    
+    for entry in logs:
+        rollup['pulls'] += 1
+        
+        for player in entry['players']:
+            stats = rollup['players'].setdefault(player['name'], {
+                'pulls': 0,
+                'totalScore': 0,
+                'totalActualPoints': 0,
+                'totalPossiblePoints': 0,
+                'minScore': player['score'],
+                'maxScore': player['score'],
+                'scoreHistogram': {},
+                'class': 'Unknown',
+                'role': 'UNKNOWN',
+                'raids': [],
+                'encounters': []
+            })
+            stats['pulls'] += 1
+            stats['totalScore'] += player['score']
+            stats['totalActualPoints'] += player['actualPoints']
+            stats['totalPossiblePoints'] += player['possiblePoints']
+            stats['minScore'] = min(stats['minScore'], player['score'])
+            stats['maxScore'] = max(stats['maxScore'], player['score'])
+            bucket = str(player['score'])
+            stats['scoreHistogram'][bucket] = stats['scoreHistogram'].get(bucket, 0) + 1
+            stats['class'] = player['class']
+            stats['role'] = player['role']
+            if entry['raid'] not in stats['raids']:
+                stats['raids'].append(entry['raid'])
+            if entry['encounter'] not in stats['encounters']:
+                stats['encounters'].append(entry['encounter'])
+        
+        key = f"{entry['raid']} - {entry['encounter']}"
+        stats = rollup['encounters'].setdefault(key, {
+            'raid': '',
+            'pulls': 0,
+            'totalPlayers': 0,
+            'scoreSum': 0.0,
+            'scoreCount': 0,
+            'dates': [],
+            'requesters': []
+        })
+        stats['pulls'] += 1
+        stats['raid'] = entry['raid']
+        stats['totalPlayers'] += entry['groupSize']
+        if entry['date'] not in stats['dates']:
+            stats['dates'].append(entry['date'])
+        if entry['requester'] not in stats['requesters']:
+            stats['requesters'].append(entry['requester'])
+        if entry['players']:
+            stats['scoreSum'] += sum(p['score'] for p in entry['players']) / len(entry['players'])
+            stats['scoreCount'] += 1
+    
+    return rollup
+
+
+def merge_rollups(rollups: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine rollups (in chronological order, so the latest class/role wins)"""
+    merged = {'pulls': 0, 'players': {}, 'encounters': {}}
+    
+    for rollup in rollups:
+        merged['pulls'] += rollup['pulls']
+        
+        for name, stats in rollup['players'].items():
+            target = merged['players'].get(name)
+            if target is None:
+                merged['players'][name] = dict(stats, scoreHistogram=dict(stats['scoreHistogram']),
+                                                raids=list(stats['raids']), encounters=list(stats['encounters']))
+                continue
+            for field in ('pulls', 'totalScore', 'totalActualPoints', 'totalPossiblePoints'):
+                target[field] += stats[field]
+            target['minScore'] = min(target['minScore'], stats['minScore'])
+            target['maxScore'] = max(target['maxScore'], stats['maxScore'])
+            for bucket, count in stats['scoreHistogram'].items():
+                target['scoreHistogram'][bucket] = target['scoreHistogram'].get(bucket, 0) + count
+            target['class'] = stats['class']
+            target['role'] = stats['role']
+            target['raids'] += [r for r in stats['raids'] if r not in target['raids']]
+            target['encounters'] += [e for e in stats['encounters'] if e not in target['encounters']]
+        
+        for key, stats in rollup['encounters'].items():
+            target = merged['encounters'].get(key)
+            if target is None:
+                merged['encounters'][key] = dict(stats, dates=list(stats['dates']),
+                                                 requesters=list(stats['requesters']))
+                continue
+            for field in ('pulls', 'totalPlayers', 'scoreSum', 'scoreCount'):
+                target[field] += stats[field]
+            target['raid'] = stats['raid']
+            target['dates'] += [d for d in stats['dates'] if d not in target['dates']]
+            target['requesters'] += [r for r in stats['requesters'] if r not in target['requesters']]
+    
+    return merged
+
+
+def _histogram_median(histogram: Dict[str, int]) -> int:
+    """Median score from a score histogram"""
+    total = sum(histogram.values())
+    running = 0
+    for bucket in sorted(histogram, key=int):
+        running += histogram[bucket]
+        if running * 2 >= total:
+            return int(bucket)
+    return 0
+
+
+def rollup_player_stats(rollup: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Player statistics from a rollup, in the same shape as aggregate_by_player"""
+    result = {}
+    for name, stats in rollup['players'].items():
+        result[name] = {
+            'name': name,
+            'class': stats['class'],
+            'role': stats['role'],
+            'pulls': stats['pulls'],
+            'avgScore': round(stats['totalScore'] / stats['pulls'], 1) if stats['pulls'] > 0 else 0,
+            'minScore': stats['minScore'],
+            'maxScore': stats['maxScore'],
+            'medianScore': _histogram_median(stats['scoreHistogram']),
+            'totalActualPoints': stats['totalActualPoints'],
+            'totalPossiblePoints': stats['totalPossiblePoints'],
+            'raids': sorted(stats['raids']),
+            'encounters': sorted(stats['encounters'])
+        }
+    return result
+
+
+def rollup_encounter_stats(rollup: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Encounter statistics from a rollup, in the same shape as aggregate_by_encounter"""
+    result = {}
+    for key, stats in rollup['encounters'].items():
+        result[key] = {
+            'encounter': key,
+            'raid': stats['raid'],
+            'pulls': stats['pulls'],
+            'avgGroupSize': round(stats['totalPlayers'] / stats['pulls'], 1) if stats['pulls'] > 0 else 0,
+            'avgScore': round(stats['scoreSum'] / stats['scoreCount'], 1) if stats['scoreCount'] else 0,
+            'dates': sorted(stats['dates']),
+            'requesters': sorted(stats['requesters'])
+        }
+    return result
+
+
+def _rollup_fingerprint(logs: List[Dict[str, Any]]) -> str:
+    """Hash of a night's pulls, used to tell whether its rollup is stale"""
+    import hashlib
+    import json
+    
+    return hashlib.sha1(json.dumps(logs, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_rollup_store(store_path: Path) -> Dict[str, Any]:
+    """Load the rollup store, or start an empty one"""
+    import json
+    
+    if store_path.exists():
+        try:
+            with store_path.open('r', encoding='utf-8') as f:
+                store = json.load(f)
+            if store.get('version') == ROLLUP_VERSION:
+                return store
+        except (OSError, ValueError):
+            pass
+    return {'version': ROLLUP_VERSION, 'nights': {}, 'periods': {}}
+
+
+def save_rollup_store(store: Dict[str, Any], store_path: Path):
+    """Write the rollup store"""
+    import json
+    
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    with store_path.open('w', encoding='utf-8') as f:
+        json.dump(store, f, ensure_ascii=False)
+
+
+def update_rollup_store(store: Dict[str, Any], logs: Iterable[Dict[str, Any]]) -> int:
+    """
+    Refresh the per-night rollups from parsed pulls
+    
+    Each stored night remembers the identities of its pulls. A night is rebuilt
+    when the log holds every stored pull of it (and something changed). If the
+    log only covers part of a stored night (cleared mid-raid, another officer's
+    log), its new pulls are merged into the stored rollup instead, so no stored
+    pulls are lost. Nights no longer present in the log are kept.
+    Pulls must arrive in chronological order; only one raid night of them
+    is held in memory at a time. Returns the number of nights rebuilt or merged.
+    """
+    updated = 0
+    for night, entries in groupby(logs, key=raid_night_key):
+        entries = list(entries)
+        fingerprint = _rollup_fingerprint(entries)
+        cached = store['nights'].get(night)
+        if cached and cached['fingerprint'] == fingerprint:
+            continue
+        
+        pull_ids = [pull_id(entry) for entry in entries]
+        stored_ids = cached['pullIds'] if cached else []
+        log_times = _pull_times(pull_ids)
+        
+        # Another officer's copy of a stored pull counts as the same pull
+        if all(_has_pull(log_times, tuple(stored[1:]), stored[0]) for stored in stored_ids):
+            # The log has every stored pull of this night: rebuild from scratch
+            rollup = build_rollup(entries)
+            rollup['fingerprint'] = fingerprint
+            rollup['pullIds'] = pull_ids
+        else:
+            stored_times = _pull_times(stored_ids)
+            new_entries = [entry for entry in entries
+                           if not _has_pull(stored_times, pull_identity(entry), entry['timestamp'])]
+            if not new_entries:
+                continue
+            rollup = merge_rollups([cached, build_rollup(new_entries)])
+            rollup['fingerprint'] = _rollup_fingerprint([cached['fingerprint'], fingerprint])
+            rollup['pullIds'] = cached['pullIds'] + [pull_id(entry) for entry in new_entries]
+            print(f"⚠ {night}: log covers only part of the stored night; "
+                  f"merged {len(new_entries)} new pulls into {cached['pulls']} stored pulls")
+        
+        store['nights'][night] = rollup
+        updated += 1
+    
+    return updated
+
+
+def rollup_view(store: Dict[str, Any], period: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Rollups per night, week or season, built by merging the nightly rollups
+    
+    Merged week/season rollups are cached in the store and only rebuilt when
+    one of their nights changed.
+    """
+    nights_by_period = defaultdict(list)
+    for night in sorted(store['nights']):
+        nights_by_period[rollup_period_key(night, period)].append(night)
+    
+    view = {}
+    for key, nights in nights_by_period.items():
+        if period == 'night':
+            view[key] = store['nights'][key]
+            continue
+        fingerprints = {night: store['nights'][night]['fingerprint'] for night in nights}
+        cache_key = f"{period}:{key}"
+        cached = store['periods'].get(cache_key)
+        if not cached or cached['nights'] != fingerprints:
+            cached = {
+                'nights': fingerprints,
+                'rollup': merge_rollups(store['nights'][night] for night in nights)
+            }
+            store['periods'][cache_key] = cached
+        view[key] = cached['rollup']
+    
+    return view
+
+
+def print_rollup_overview(view: Dict[str, Dict[str, Any]], period: str):
+    """Print one line per night/week/season"""
+    print(f"\n{'='*80}")
+    print(f"Consume Scores by {period.title()}")
+    print(f"{'='*80}")
+    print(f"{'Period':<14} {'Pulls':<7} {'Players':<9} {'Avg':<7}")
+    print(f"{'-'*80}")
+    for key in sorted(view):
+        rollup = view[key]
+        player_pulls = sum(p['pulls'] for p in rollup['players'].values())
+        total_score = sum(p['totalScore'] for p in rollup['players'].values())
+        avg_score = total_score / player_pulls if player_pulls else 0
+        print(f"{key:<14} {rollup['pulls']:<7} {len(rollup['players']):<9} {avg_score:<7.1f}")
+
+
+def load_trend_store(store_path: Path) -> Dict[str, Any]:
+    """Load the trend store (one window state per --trend/--window setting), or start an empty one"""
+    import json
+    
+    if store_path.exists():
+        try:
+            with store_path.open('r', encoding='utf-8') as f:
+                store = json.load(f)
+            if store.get('version') == TREND_VERSION:
+                return store
+            if store.get('version') == 1:
+                # Version 1 held a single window state; keep it under its settings
+                store.pop('version')
+                return {'version': TREND_VERSION, 'states': {_trend_state_key(store['by'], store['window']): store}}
+        except (OSError, ValueError, KeyError):
+            pass
+    return {'version': TREND_VERSION, 'states': {}}
+
+
+def save_trend_store(store: Dict[str, Any], store_path: Path):
+    """Write the trend store"""
+    import json
+    
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    with store_path.open('w', encoding='utf-8') as f:
+        json.dump(store, f, ensure_ascii=False)
+
+
+def _trend_state_key(by: str, window: int) -> str:
+    return f"{by}_{window}"
+
+
+def trend_state(store: Dict[str, Any], by: str, window: int) -> Dict[str, Any]:
+    """
+    Window state for one --trend/--window setting, started fresh if missing
+    
+    Each setting keeps its own state (and watermark), so switching between
+    settings never discards the history another one has collected.
+    """
+    return store['states'].setdefault(_trend_state_key(by, window), {
+        'by': by,
+        'window': window,
+        'watermark': {'timestamp': 0, 'seen': []},
+        'players': {},
+        'encounters': {}
+    })
+
+
+def _add_trend_sample(series: Dict[str, Any], period: str, value: float, by: str, window: int):
+    """Add one sample to a series, keeping only the last `window` values"""
+    if by == 'pulls':
+        series['values'].append(value)
+    else:
+        # Weekly mode: samples accumulate into the open week until the next week starts
+        open_week = series.get('open')
+        if open_week and open_week['period'] != period:
+            series['values'].append(open_week['sum'] / open_week['count'])
+            open_week = None
+        if not open_week:
+            open_week = {'period': period, 'sum': 0.0, 'count': 0}
+            series['open'] = open_week
+        open_week['sum'] += value
+        open_week['count'] += 1
+    del series['values'][:-window]
+
+
+def update_trend_state(state: Dict[str, Any], logs: Iterable[Dict[str, Any]]) -> int:
+    """
+    Feed new pulls into the rolling trend windows
+    
+    Pulls must arrive in chronological order. Pulls before the last ingested
+    timestamp were already counted by a previous run and are skipped, so only
+    new pulls are processed. The watermark remembers the pulls of its last
+    DUPLICATE_TOLERANCE_SECONDS, so another officer's copy of an ingested pull
+    is skipped too. Returns the number of pulls ingested.
+    """
+    by = state['by']
+    window = state['window']
+    watermark = state['watermark']
+    seen_times = _pull_times(watermark['seen'])
+    ingested = 0
+    
+    for entry in logs:
+        identity = pull_identity(entry)
+        if entry['timestamp'] < watermark['timestamp'] - DUPLICATE_TOLERANCE_SECONDS:
+            continue
+        if _has_pull(seen_times, identity, entry['timestamp']):
+            continue
+        watermark['timestamp'] = max(watermark['timestamp'], entry['timestamp'])
+        watermark['seen'].append(pull_id(entry))
+        seen_times[identity].append(entry['timestamp'])
+        
+        period = rollup_period_key(raid_night_key(entry), 'week')
+        for player in entry['players']:
+            series = state['players'].setdefault(player['name'], {'values': []})
+            series['class'] = player['class']
+            series['role'] = player['role']
+            _add_trend_sample(series, period, player['score'], by, window)
+        
+        if entry['players']:
+            key = f"{entry['raid']} - {entry['encounter']}"
+            series = state['encounters'].setdefault(key, {'values': []})
+            pull_score = sum(p['score'] for p in entry['players']) / len(entry['players'])
+            _add_trend_sample(series, period, pull_score, by, window)
+        
+        ingested += 1
+    
+    watermark['seen'] = [stored for stored in watermark['seen']
+                         if stored[0] >= watermark['timestamp'] - DUPLICATE_TOLERANCE_SECONDS]
+    return ingested
+
+
+def _slope(values: List[float]) -> float:
+    """Least-squares slope of values per step (pull or week)"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    numerator = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    denominator = sum((i - mean_x) ** 2 for i in range(n))
+    return numerator / denominator
+
+
+def trend_metrics(state: Dict[str, Any], kind: str, drop_threshold: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Moving average, slope and drop flag for each player or encounter series
+    
+    In weekly mode the current (open) week is included as the latest value so
+    slipping players show up right after a raid. A series is flagged when its
+    latest value is drop_threshold points or more below the average of the
+    earlier values in the window.
+    """
+    result = {}
+    for name, series in state[kind].items():
+        values = list(series['values'])
+        if series.get('open'):
+            values.append(series['open']['sum'] / series['open']['count'])
+        values = values[-state['window']:]
+        if not values:
+            continue
+        
+        latest = values[-1]
+        previous_avg = sum(values[:-1]) / (len(values) - 1) if len(values) > 1 else latest
+        result[name] = {
+            'name': name,
+            'class': series.get('class', ''),
+            'role': series.get('role', ''),
+            'samples': len(values),
+            'movingAvg': round(sum(values) / len(values), 1),
+            'slope': round(_slope(values), 2),
+            'latest': round(latest, 1),
+            'change': round(latest - previous_avg, 1),
+            'dropped': len(values) > 1 and previous_avg - latest >= drop_threshold
+        }
+    return result
+
+
+def print_trend_report(player_trends: Dict[str, Dict[str, Any]],
+                       encounter_trends: Dict[str, Dict[str, Any]], by: str, window: int, top_n: int = 20):
+    """Print flagged players and the steepest player/encounter trends"""
+    step = 'pull' if by == 'pulls' else 'week'
+    
+    print(f"\n{'='*80}")
+    print(f"Consume Score Trends (last {window} {by})")
+    print(f"{'='*80}")
+    
+    dropped = sorted((t for t in player_trends.values() if t['dropped']), key=lambda x: x['change'])
+    print(f"Players with a score drop: {len(dropped)}")
+    print(f"\n{'Player':<20} {'Class':<10} {'Role':<8} {'N':<4} {'MovAvg':<8} {'Slope/' + step:<12} {'Latest':<8} {'Change':<8}")
+    print(f"{'-'*80}")
+    rows = dropped + sorted((t for t in player_trends.values() if not t['dropped']), key=lambda x: x['slope'])
+    for trend in rows[:top_n]:
+        flag = ' ⚠' if trend['dropped'] else ''
+        print(f"{trend['name']:<20} {trend['class']:<10} {trend['role']:<8} {trend['samples']:<4} "
+              f"{trend['movingAvg']:<8.1f} {trend['slope']:<12.2f} {trend['latest']:<8.1f} {trend['change']:<+8.1f}{flag}")
+    
+    if encounter_trends:
+        print(f"\n{'Encounter':<40} {'N':<4} {'MovAvg':<8} {'Slope/' + step:<12} {'Latest':<8} {'Change':<8}")
+        print(f"{'-'*80}")
+        for trend in sorted(encounter_trends.values(), key=lambda x: x['slope']):
+            flag = ' ⚠' if trend['dropped'] else ''
+            print(f"{trend['name']:<40} {trend['samples']:<4} {trend['movingAvg']:<8.1f} "
+                  f"{trend['slope']:<12.2f} {trend['latest']:<8.1f} {trend['change']:<+8.1f}{flag}")
+
+
+def _matches_any(value: str, wanted: Optional[List[str]]) -> bool:
+    """Case-insensitive filter match; no filter matches everything"""
+    return not wanted or value.casefold() in (w.casefold() for w in wanted)
+
+
+def _safe_path_name(text: str) -> str:
+    """Make a raid/encounter/date usable as a folder name"""
+    return re.sub(r'[^\w\- ]+', '-', text).strip(' -') or 'unknown'
+
+
+def build_report_matrix(logs: Iterable[Dict[str, Any]], raids: List[str] = None,
+                        dates: List[str] = None, encounters: List[str] = None) -> Dict[str, Any]:
+    """
+    Group pulls by raid night and encounter in a single pass
+    
+    Raid nights are keyed by raid and raid_night_key (the same nights --rollup
+    uses), so a pull after midnight stays with the night it belongs to. The
+    dates filter still matches the MM/DD date written by the addon.
+    
+    Each encounter gets one rollup; raid night and overall rollups are merged
+    from those instead of refiltering and re-aggregating the pulls per report.
+    Optional raid/date/encounter lists restrict the matrix to a subset.
+    """
+    matrix = {'entries': [], 'nights': {}}
+    
+    for entry in logs:
+        if not (_matches_any(entry['raid'], raids) and _matches_any(entry['date'], dates)
+                and _matches_any(entry['encounter'], encounters)):
+            continue
+        
+        night_key = raid_night_key(entry)
+        night = matrix['nights'].setdefault((night_key, entry['raid']), {
+            'raid': entry['raid'],
+            'night': night_key,
+            'entries': [],
+            'encounters': {}
+        })
+        matrix['entries'].append(entry)
+        night['entries'].append(entry)
+        night['encounters'].setdefault(entry['encounter'], {'entries': []})['entries'].append(entry)
+    
+    for night in matrix['nights'].values():
+        for encounter in night['encounters'].values():
+            encounter['rollup'] = build_rollup(encounter['entries'])
+        night['rollup'] = merge_rollups(e['rollup'] for e in night['encounters'].values())
+    matrix['rollup'] = merge_rollups(night['rollup'] for _, night in sorted(matrix['nights'].items()))
+    
+    return matrix
+
+
+def write_report(report_dir: Path, entries: List[Dict[str, Any]], rollup: Dict[str, Any]):
+    """Write summary (player/encounter stats) and detail (pull CSV/JSON) exports for one report"""
+    report_dir.mkdir(parents=True, exist_ok=True)
+    export_player_aggregate_csv(rollup_player_stats(rollup), report_dir / 'consume_player_stats.csv')
+    export_encounter_aggregate_csv(rollup_encounter_stats(rollup), report_dir / 'consume_encounter_stats.csv')
+    export_to_csv(entries, report_dir / 'consume_tracking.csv')
+    export_to_json(entries, report_dir / 'consume_tracking.json')
+
+
+def write_report_matrix(matrix: Dict[str, Any], batch_dir: Path) -> int:
+    """
+    Write every report of the matrix into an output tree
+    
+    batch_dir/                       all selected pulls
+    batch_dir/<night>_<raid>/        all encounters of that raid night
+    batch_dir/<night>_<raid>/<enc>/  a single encounter
+    
+    Returns the number of reports written.
+    """
+    write_report(batch_dir, matrix['entries'], matrix['rollup'])
+    reports = 1
+    
+    for (night_key, raid), night in sorted(matrix['nights'].items()):
+        night_dir = batch_dir / _safe_path_name(f"{night_key}_{raid}")
+        write_report(night_dir, night['entries'], night['rollup'])
+        reports += 1
+        
+        for name, encounter in sorted(night['encounters'].items()):
+            write_report(night_dir / _safe_path_name(name), encounter['entries'], encounter['rollup'])
+            reports += 1
+    
+    return reports
+
+
+def export_timestamp() -> str:
+    """Timestamp used in export file names"""
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+
 def export_to_json(logs: List[Dict[str, Any]], output_path: Path):
     """Export logs to JSON format"""
+    import json
+    
     with output_path.open('w', encoding='utf-8') as f:
         json.dump(logs, f, indent=2, ensure_ascii=False)
     print(f"✓ Exported {len(logs)} entries to {output_path}")
@@ -202,6 +1100,8 @@ def export_to_json(logs: List[Dict[str, Any]], output_path: Path):
 
 def export_to_csv(logs: List[Dict[str, Any]], output_path: Path):
     """Export logs to CSV format (one row per player per pull)"""
+    import csv
+    
     if not logs:
         print("⚠ No data to export")
         return
@@ -241,6 +1141,8 @@ def export_to_csv(logs: List[Dict[str, Any]], output_path: Path):
 
 def export_player_aggregate_csv(player_stats: Dict[str, Dict[str, Any]], output_path: Path):
     """Export aggregated player statistics to CSV"""
+    import csv
+    
     if not player_stats:
         print("⚠ No player data to export")
         return
@@ -251,7 +1153,7 @@ def export_player_aggregate_csv(player_stats: Dict[str, Dict[str, Any]], output_
         # Header
         writer.writerow([
             'PlayerName', 'Class', 'Role', 'Pulls', 
-            'AvgScore', 'MinScore', 'MaxScore',
+            'AvgScore', 'MedianScore', 'MinScore', 'MaxScore',
             'TotalActualPoints', 'TotalPossiblePoints',
             'Raids', 'Encounters'
         ])
@@ -267,6 +1169,7 @@ def export_player_aggregate_csv(player_stats: Dict[str, Dict[str, Any]], output_
                 player['role'],
                 player['pulls'],
                 player['avgScore'],
+                player['medianScore'],
                 player['minScore'],
                 player['maxScore'],
                 player['totalActualPoints'],
@@ -280,6 +1183,8 @@ def export_player_aggregate_csv(player_stats: Dict[str, Dict[str, Any]], output_
 
 def export_encounter_aggregate_csv(encounter_stats: Dict[str, Dict[str, Any]], output_path: Path):
     """Export aggregated encounter statistics to CSV"""
+    import csv
+    
     if not encounter_stats:
         print("⚠ No encounter data to export")
         return
@@ -310,6 +1215,42 @@ def export_encounter_aggregate_csv(encounter_stats: Dict[str, Dict[str, Any]], o
     print(f"✓ Exported {len(encounter_stats)} encounter statistics to {output_path}")
 
 
+def export_trends_csv(trends: Dict[str, Dict[str, Any]], output_path: Path, label: str):
+    """Export player or encounter trends to CSV"""
+    import csv
+    
+    if not trends:
+        print(f"⚠ No {label} trends to export")
+        return
+    
+    with output_path.open('w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        
+        # Header
+        writer.writerow([
+            label.title(), 'Class', 'Role', 'Samples', 'MovingAvg', 'Slope', 'Latest', 'Change', 'Dropped'
+        ])
+        
+        # Flagged first, then steepest decline first
+        sorted_trends = sorted(trends.values(), key=lambda x: (not x['dropped'], x['slope']))
+        
+        # Data rows
+        for trend in sorted_trends:
+            writer.writerow([
+                trend['name'],
+                trend['class'],
+                trend['role'],
+                trend['samples'],
+                trend['movingAvg'],
+                trend['slope'],
+                trend['latest'],
+                trend['change'],
+                'yes' if trend['dropped'] else ''
+            ])
+    
+    print(f"✓ Exported {len(trends)} {label} trends to {output_path}")
+
+
 def print_summary(logs: List[Dict[str, Any]]):
     """Print a summary of the parsed logs"""
     if not logs:
@@ -500,16 +1441,68 @@ def get_user_choices(logs: List[Dict[str, Any]]):
     }
 
 
+def load_profile(profile_path: Path) -> Dict[str, Any]:
+    """Load saved report answers (see PROFILE_KEYS)"""
+    import json
+    
+    with profile_path.open('r', encoding='utf-8') as f:
+        profile = json.load(f)
+    return {key: profile[key] for key in PROFILE_KEYS if profile.get(key) is not None}
+
+
+def save_profile(profile_path: Path, answers: Dict[str, Any]):
+    """Save report answers so later runs can skip the interactive menu"""
+    import json
+    
+    profile = {key: answers[key] for key in PROFILE_KEYS if answers.get(key) is not None}
+    if 'output' in profile:
+        profile['output'] = str(profile['output'])
+    
+    profile_path.parent.mkdir(parents=True, exist_ok=True)
+    with profile_path.open('w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+    print(f"✓ Saved answers to profile {profile_path}")
+
+
+def apply_profile(args, profile: Dict[str, Any]):
+    """Fill answers not given on the command line from a profile (players is validated like --players)"""
+    for key, value in profile.items():
+        if getattr(args, key) is not None:
+            continue
+        if key in PROFILE_LIST_KEYS and isinstance(value, str):
+            value = [value]
+        elif key == 'output':
+            value = Path(value)
+        elif key == 'players':
+            value = non_negative_int(str(value))
+        setattr(args, key, value)
+
+
+def answers_from_choices(user_choices: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert get_user_choices() results to report answers"""
+    return {
+        'mode': user_choices['output_mode'],
+        'raid': [user_choices['selected_raid']] if user_choices['selected_raid'] else None,
+        'date': [user_choices['selected_date']] if user_choices['selected_raid'] else None,
+        'encounter': [user_choices['selected_encounter']] if user_choices['selected_encounter'] else None,
+        'players': user_choices['top_n'] or 0
+    }
+
+
 def main():
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Parse OG-RaidHelper consume tracking logs from WoWCombatLog.txt'
     )
     parser.add_argument(
-        'logfile',
-        nargs='?',
+        'logfiles',
+        nargs='*',
         type=Path,
-        default=Path('WoWCombatLog.txt'),
-        help='Path to WoWCombatLog.txt (default: WoWCombatLog.txt in current folder)'
+        default=[Path('WoWCombatLog.txt')],
+        metavar='logfile',
+        help='Path to WoWCombatLog.txt (default: WoWCombatLog.txt in current folder). '
+             'Several logs are merged into one chronological timeline'
     )
     parser.add_argument(
         '-o', '--output',
@@ -533,15 +1526,117 @@ def main():
     )
     parser.add_argument(
         '--top',
-        type=int,
-        default=20,
-        help='Number of top players to show in leaderboard (default: 20)'
+        type=positive_int,
+        help=f'Number of top players to show in leaderboard (default: {DEFAULT_TOP_PLAYERS}); '
+             'scripted runs use it when --players is not given'
     )
     parser.add_argument(
         '--quiet',
         action='store_true',
         help='Suppress summary output'
     )
+    parser.add_argument(
+        '--block-size',
+        type=positive_int,
+        default=DEFAULT_BLOCK_SIZE // 1024,
+        help=f'Read-ahead block size in KiB (default: {DEFAULT_BLOCK_SIZE // 1024})'
+    )
+    parser.add_argument(
+        '--queue-depth',
+        type=positive_int,
+        default=DEFAULT_QUEUE_DEPTH,
+        help=f'Number of blocks read ahead of the parser (default: {DEFAULT_QUEUE_DEPTH})'
+    )
+    parser.add_argument(
+        '--player',
+        help='Show one player\'s pull and segment history using the player index (skips the full parse)'
+    )
+    parser.add_argument(
+        '--index',
+        type=Path,
+        help='Player index file (default: <logfile>.ogrh_index.json next to the log; single log only)'
+    )
+    parser.add_argument(
+        '--update-index',
+        action='store_true',
+        help='Only bring the player index up to date with the log(s), then exit'
+    )
+    parser.add_argument(
+        '--rollup',
+        choices=ROLLUP_PERIODS,
+        help='Report from stored per-night rollups, merged by night, week or season'
+    )
+    parser.add_argument(
+        '--period',
+        help='Night (YYYY-MM-DD), week (YYYY-Www) or season (YYYY-Qn) to report with --rollup (default: latest)'
+    )
+    parser.add_argument(
+        '--rollups',
+        type=Path,
+        help='Rollup store file (default: consume_rollups.json in the output folder)'
+    )
+    parser.add_argument(
+        '--trend',
+        choices=TREND_MODES,
+        help='Rolling consume score trends per player and encounter over the last N pulls or raid weeks'
+    )
+    parser.add_argument(
+        '--window',
+        type=positive_int,
+        help='Trend window size (default: 10 pulls or 4 weeks)'
+    )
+    parser.add_argument(
+        '--drop-threshold',
+        type=float,
+        default=DEFAULT_TREND_DROP,
+        help=f'Flag a drop when the latest score is this many points below the window average (default: {DEFAULT_TREND_DROP:g})'
+    )
+    parser.add_argument(
+        '--trends',
+        type=Path,
+        help='Trend state file (default: consume_trends.json in the output folder)'
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Write summary and detail reports for every raid night and encounter from a single parse'
+    )
+    parser.add_argument(
+        '--raid',
+        action='append',
+        help='Only include this raid (repeatable)'
+    )
+    parser.add_argument(
+        '--date',
+        action='append',
+        help='Only include this raid date, as shown in the log, e.g. 01/08 (repeatable)'
+    )
+    parser.add_argument(
+        '--encounter',
+        action='append',
+        help='Only include this encounter (repeatable)'
+    )
+    parser.add_argument(
+        '--mode',
+        choices=('summary', 'details'),
+        help='Answer the output mode question (skips the interactive menu); '
+             'combine with --raid/--date/--encounter/--players (default: summary when any of those is given)'
+    )
+    parser.add_argument(
+        '--players',
+        type=non_negative_int,
+        help='Summary mode: show only the top N players (0 = all)'
+    )
+    parser.add_argument(
+        '--profile',
+        type=Path,
+        help='Load report answers (mode, raid, date, encounter, players, output) from a saved profile'
+    )
+    parser.add_argument(
+        '--save-profile',
+        type=Path,
+        help='Save this run\'s report answers (from flags or the interactive menu) to a profile'
+    )
     parser.add_argument(
         '--interactive',
         action='store_true',
@@ -550,67 +1645,211 @@ def main():
     
     args = parser.parse_args()
     
+    # Answers from a saved profile (command-line flags take precedence)
+    if args.profile:
+        if not args.profile.exists():
+            print(f"✗ Error: Profile not found: {args.profile}")
+            return 1
+        try:
+            apply_profile(args, load_profile(args.profile))
+        except argparse.ArgumentTypeError as exc:
+            print(f"✗ Error: Invalid 'players' in profile {args.profile}: {exc}")
+            return 1
+    
+    # Report answers without a mode still mean a scripted run (batch uses them as filters)
+    if not args.mode and not args.batch and (args.raid or args.date or args.encounter or args.players is not None):
+        args.mode = 'summary'
+    
+    # An explicit --top sizes the scripted leaderboard unless --players (or the profile) does
+    if args.top is None:
+        args.top = DEFAULT_TOP_PLAYERS
+    elif args.mode and args.players is None:
+        args.players = args.top
+    
     # Auto-enable interactive mode if no export flags are set
-    if not any([args.json, args.csv, args.aggregate, args.quiet]):
+    if not any([args.json, args.csv, args.aggregate, args.quiet, args.player, args.update_index, args.rollup, args.trend, args.batch, args.mode]):
         args.interactive = True
     
-    # Check if log file exists
-    if not args.logfile.exists():
-        print(f"✗ Error: Log file not found: {args.logfile}")
-        return 1
+    # Check if log files exist
+    for logfile in args.logfiles:
+        if not logfile.exists():
+            print(f"✗ Error: Log file not found: {logfile}")
+            return 1
     
-    # Parse the log file
-    print(f"Parsing {args.logfile}...")
-    logs = parse_combatlog_file(args.logfile)
+    # Player index works on raw byte offsets, so it needs an uncompressed log
+    if args.player or args.update_index:
+        for logfile in args.logfiles:
+            if is_compressed(logfile):
+                print(f"✗ Error: Player index needs an uncompressed log: {logfile}")
+                return 1
     
-    if not logs:
-        print("⚠ No OGRH_CONSUME entries found in log file.")
+    # Player index: update only
+    if args.update_index and not args.player:
+        for logfile in args.logfiles:
+            index = update_player_index(logfile, args.index if len(args.logfiles) == 1 else None)
+            print(f"✓ Indexed {len(index['players'])} players in {logfile}")
         return 0
     
-    # Interactive mode
-    if args.interactive:
-        user_choices = get_user_choices(logs)
+    # Player history lookup (decodes only this player's records)
+    if args.player:
+        history = query_player_history(args.logfiles, args.player, args.index)
+        print_player_history(args.player, history)
         
-        # Filter by raid and date if selected
-        if user_choices['selected_raid']:
-            logs = [entry for entry in logs 
-                   if entry['raid'] == user_choices['selected_raid'] 
-                   and entry['date'] == user_choices['selected_date']]
-            
-            # Further filter by encounter if selected
-            if user_choices['selected_encounter']:
-                logs = [entry for entry in logs 
-                       if entry['encounter'] == user_choices['selected_encounter']]
-        
-        # Generate output based on mode
-        if user_choices['output_mode'] == 'summary':
-            # Aggregated statistics
-            player_stats = aggregate_by_player(logs)
-            encounter_stats = aggregate_by_encounter(logs)
-            
-            # Print summary
-            print_summary(logs)
-            print_player_leaderboard(player_stats, user_choices['top_n'] or len(player_stats))
-            
-            # Export
+        if history['pulls'] and (args.json or args.csv):
             output_dir = args.output or Path('output')
             output_dir.mkdir(parents=True, exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            export_player_aggregate_csv(player_stats, output_dir / f'consume_player_stats_{timestamp}.csv')
-            export_encounter_aggregate_csv(encounter_stats, output_dir / f'consume_encounter_stats_{timestamp}.csv')
+            timestamp = export_timestamp()
+            if args.json:
+                export_to_json(history['pulls'], output_dir / f'consume_player_{args.player}_{timestamp}.json')
+            if args.csv:
+                export_to_csv(history['pulls'], output_dir / f'consume_player_{args.player}_{timestamp}.csv')
+        return 0
+    
+    # Parse the log file(s) as a stream; rollups and trends consume it directly
+    block_size = args.block_size * 1024
+    if len(args.logfiles) == 1:
+        print(f"Parsing {args.logfiles[0]}...")
+        logs = iter_combatlog_file(args.logfiles[0], block_size, args.queue_depth)
+    else:
+        print(f"Merging {len(args.logfiles)} logs: {', '.join(str(p) for p in args.logfiles)}...")
+        logs = merge_combatlog_files(args.logfiles, block_size, args.queue_depth)
+    
+    first_entry = next(logs, None)
+    if first_entry is None:
+        print("⚠ No OGRH_CONSUME entries found in log file.")
+        return 0
+    logs = chain([first_entry], logs)
+    
+    # Rollup reports (night/week/season views merged from nightly rollups)
+    if args.rollup:
+        output_dir = args.output or Path('output')
+        store_path = args.rollups or output_dir / 'consume_rollups.json'
+        store = load_rollup_store(store_path)
+        updated = update_rollup_store(store, logs)
+        view = rollup_view(store, args.rollup)
+        save_rollup_store(store, store_path)
+        print(f"✓ Rollups: {len(store['nights'])} raid nights stored, {updated} updated ({store_path})")
+        
+        # Pulls without a usable timestamp land in 'unknown'; never pick that as the latest
+        known_periods = [key for key in view if key != 'unknown']
+        period = args.period or max(known_periods or view)
+        if period not in view:
+            print(f"✗ Error: No {args.rollup} '{period}' in rollups. Available: {', '.join(sorted(view))}")
+            return 1
+        
+        player_stats = rollup_player_stats(view[period])
+        encounter_stats = rollup_encounter_stats(view[period])
+        
+        if not args.quiet:
+            print_rollup_overview(view, args.rollup)
+            print(f"\n{args.rollup.title()}: {period}")
+            print_player_leaderboard(player_stats, args.top)
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = export_timestamp()
+        export_player_aggregate_csv(player_stats, output_dir / f'consume_player_stats_{period}_{timestamp}.csv')
+        export_encounter_aggregate_csv(encounter_stats, output_dir / f'consume_encounter_stats_{period}_{timestamp}.csv')
+        return 0
+    
+    # Rolling trends (only pulls newer than the last run are ingested)
+    if args.trend:
+        output_dir = args.output or Path('output')
+        store_path = args.trends or output_dir / 'consume_trends.json'
+        window = args.window or DEFAULT_TREND_WINDOW[args.trend]
+        store = load_trend_store(store_path)
+        state = trend_state(store, args.trend, window)
+        ingested = update_trend_state(state, logs)
+        save_trend_store(store, store_path)
+        print(f"✓ Trends: {ingested} new pulls ingested ({store_path})")
+        
+        player_trends = trend_metrics(state, 'players', args.drop_threshold)
+        encounter_trends = trend_metrics(state, 'encounters', args.drop_threshold)
+        
+        if not args.quiet:
+            print_trend_report(player_trends, encounter_trends, args.trend, window, args.top)
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = export_timestamp()
+        export_trends_csv(player_trends, output_dir / f'consume_player_trends_{timestamp}.csv', 'player')
+        export_trends_csv(encounter_trends, output_dir / f'consume_encounter_trends_{timestamp}.csv', 'encounter')
+        return 0
+    
+    # The remaining reports list, filter and export every pull, so collect them
+    logs = list(logs)
+    
+    # Batch report matrix (every raid night x encounter from this one parse)
+    if args.batch:
+        matrix = build_report_matrix(logs, args.raid, args.date, args.encounter)
+        if not matrix['entries']:
+            print("⚠ No pulls match the selected raids/dates/encounters.")
+            return 0
+        
+        if not args.quiet:
+            print_summary(matrix['entries'])
+        
+        timestamp = export_timestamp()
+        batch_dir = (args.output or Path('output')) / f'batch_{timestamp}'
+        reports = write_report_matrix(matrix, batch_dir)
+        print(f"✓ Batch: {reports} reports written to {batch_dir}")
+        return 0
+    
+    # Interactive mode, or scripted mode with the answers given as flags/profile
+    if args.interactive or args.mode:
+        if args.mode:
+            answers = {
+                'mode': args.mode,
+                'raid': args.raid,
+                'date': args.date,
+                'encounter': args.encounter,
+                'players': args.players or 0
+            }
         else:
-            # Details mode - individual pulls
+            answers = answers_from_choices(get_user_choices(logs))
+        
+        if args.save_profile:
+            save_profile(args.save_profile, dict(answers, output=args.output))
+        
+        # Filter by raid, date and encounter if selected
+        logs = [entry for entry in logs
+                if _matches_any(entry['raid'], answers['raid'])
+                and _matches_any(entry['date'], answers['date'])
+                and _matches_any(entry['encounter'], answers['encounter'])]
+        
+        if not logs:
+            print("⚠ No pulls match the selected raids/dates/encounters.")
+            return 0
+        
+        output_dir = args.output or Path('output')
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = export_timestamp()
+        
+        # Export flags override the mode's default exports
+        # (summary: aggregate CSVs, details: individual pulls as CSV and JSON)
+        export_json, export_csv, export_aggregate = args.json, args.csv, args.aggregate
+        if not (export_json or export_csv or export_aggregate):
+            details = answers['mode'] == 'details'
+            export_json, export_csv, export_aggregate = details, details, not details
+        
+        # Aggregated statistics
+        player_stats = aggregate_by_player(logs)
+        encounter_stats = aggregate_by_encounter(logs)
+        
+        # Print summary
+        if not args.quiet:
             print_summary(logs)
-            
-            # Export
-            output_dir = args.output or Path('output')
-            output_dir.mkdir(parents=True, exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            export_to_csv(logs, output_dir / f'consume_tracking_{timestamp}.csv')
+            if answers['mode'] == 'summary':
+                print_player_leaderboard(player_stats, answers['players'] or len(player_stats))
+        
+        if export_json:
             export_to_json(logs, output_dir / f'consume_tracking_{timestamp}.json')
         
+        if export_csv:
+            export_to_csv(logs, output_dir / f'consume_tracking_{timestamp}.csv')
+        
+        if export_aggregate:
+            export_player_aggregate_csv(player_stats, output_dir / f'consume_player_stats_{timestamp}.csv')
+            export_encounter_aggregate_csv(encounter_stats, output_dir / f'consume_encounter_stats_{timestamp}.csv')
+        
         return 0
     
     # Non-interactive mode (original behavior)
@@ -629,7 +1868,7 @@ def main():
     output_dir = args.output or Path('output')
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = export_timestamp()
     
     if args.json:
         export_to_json(logs, output_dir / f'consume_tracking_{timestamp}.json')